@@ -5,20 +5,49 @@ PyPI Publishing Script
 This script builds and publishes the package to PyPI or TestPyPI.
 It prompts for the target repository and handles the build and upload process.
 """
+import glob
 import os
 import shutil
 import subprocess
 import sys
 import hashlib
+import threading
 import urllib.request
 import time
 import socket
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+_PYPROJECT: dict | None = None
+
+
+def _pyproject() -> dict:
+    """Parse pyproject.toml once and cache the result."""
+    global _PYPROJECT
+    if _PYPROJECT is None:
+        try:
+            with open("pyproject.toml", "rb") as f:
+                _PYPROJECT = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError):
+            _PYPROJECT = {}
+    return _PYPROJECT
+
+
+_SEP = "=" * 60
+_RESET = "\033[0m"
+_COLOR = {
+    "92": "\033[92m",  # green
+    "91": "\033[91m",  # red
+    "94": "\033[94m",  # blue
+    "93": "\033[93m",  # yellow
+    "96": "\033[96m",  # cyan
+}
+
 
 def print_colored(message, color_code):
     """Print colored text to the console."""
-    print(f"\033[{color_code}m{message}\033[0m")
+    sys.stdout.write(f"{_COLOR[color_code]}{message}{_RESET}\n")
 
 
 def print_success(message):
@@ -43,9 +72,9 @@ def print_warning(message):
 
 def print_header(message):
     """Print header message."""
-    print("\n" + "=" * 60)
-    print_colored(f"  {message}", "96")
-    print("=" * 60)
+    sys.stdout.write(
+        "\n" + _SEP + "\n" + _COLOR["96"] + "  " + message + _RESET + "\n" + _SEP + "\n"
+    )
 
 
 def check_dependencies():
@@ -66,25 +95,60 @@ def check_dependencies():
             return False
 
 
+def show_auth_instructions(repository, config_file=None):
+    """Explain how to set up PyPI authentication after a failed upload."""
+    print_warning("The upload was rejected because of missing or invalid credentials.")
+    if config_file:
+        print_info(f"Check the tokens in your config file: {config_file}")
+    else:
+        print_info("Please make sure you have a ~/.pypirc file or environment variables set.")
+    if repository == "testpypi":
+        print_info("You can generate a token at https://test.pypi.org/manage/account/")
+    else:
+        print_info("You can generate a token at https://pypi.org/manage/account/")
+    print_info("For more information, visit: https://twine.readthedocs.io/en/latest/#configuration")
+
+
 def clean_dist_directory():
-    """Clean the dist directory."""
+    """Remove stale build artifacts from the dist directory."""
     dist_dir = Path("dist")
-    if dist_dir.exists():
-        print_info("Cleaning dist directory...")
-        shutil.rmtree(dist_dir)
     dist_dir.mkdir(exist_ok=True)
+    print_info("Cleaning dist directory...")
+    # Only the build artifacts need to go; unlinking them directly avoids
+    # the recursive rmtree + mkdir round trip and keeps the directory inode.
+    with os.scandir(dist_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith((".whl", ".tar.gz")):
+                os.unlink(entry.path)
+            elif entry.is_dir() and entry.name.endswith(".egg-info"):
+                shutil.rmtree(entry.path)
 
 
 def build_package():
     """Build the package."""
     print_header("Building Package")
-    try:
-        subprocess.run([sys.executable, "-m", "build"], check=True)
-        print_success("Package built successfully!")
-        return True
-    except subprocess.CalledProcessError:
+    proc = subprocess.Popen([sys.executable, "-m", "build"],
+                            stdout=sys.stdout, stderr=sys.stderr)
+
+    # The build takes seconds; overlap it with work the upload step will
+    # need anyway: importing twine and parsing pyproject.toml.
+    prewarm = threading.Thread(target=_prewarm_upload, daemon=True)
+    prewarm.start()
+
+    if proc.wait() != 0:
         print_error("Failed to build package.")
         return False
+    print_success("Package built successfully!")
+    return True
+
+
+def _prewarm_upload():
+    """Warm the caches the upload step depends on while the build runs."""
+    try:
+        __import__("twine")
+    except ImportError:
+        pass
+    _pyproject()
 
 
 def create_local_pypirc():
@@ -148,50 +212,74 @@ def upload_to_pypi(repository, config_file=None):
     """Upload the package to PyPI or TestPyPI."""
     print_header(f"Uploading to {'TestPyPI' if repository == 'testpypi' else 'PyPI'}")
     
-    cmd = [sys.executable, "-m", "twine", "upload"]
-    
+    # Non-interactive so workers with captured output fail fast on missing
+    # credentials instead of blocking on a prompt the user can't see.
+    base_cmd = [sys.executable, "-m", "twine", "upload", "--non-interactive"]
+
     if repository == "testpypi":
-        cmd.extend(["--repository", "testpypi"])
-    
+        base_cmd.extend(["--repository", "testpypi"])
+
     if config_file:
-        cmd.extend(["--config-file", config_file])
-    
-    cmd.append("dist/*")
-    
-    cmd_str = " ".join(cmd)
-    print_info(f"Running: {cmd_str}")
-    
-    try:
-        # Use shell=True to properly handle the glob pattern
-        subprocess.run(cmd_str, shell=True, check=True)
-        
-        print_success("Package uploaded successfully!")
-        
-        if repository == "testpypi":
-            package_name = get_package_name()
-            print_info(f"\nTo install from TestPyPI, run:")
-            print(f"pip install --index-url https://test.pypi.org/simple/ {package_name}")
-        else:
-            package_name = get_package_name()
-            print_info(f"\nTo install from PyPI, run:")
-            print(f"pip install {package_name}")
-            
-        return True
-    except subprocess.CalledProcessError:
+        base_cmd.extend(["--config-file", config_file])
+
+    files = sorted(glob.glob("dist/*.whl")) + sorted(glob.glob("dist/*.tar.gz"))
+
+    if not files:
+        print_error("No distribution files found in dist/.")
+        return False
+
+    print_info(f"Running: {' '.join(base_cmd)} <file> for {len(files)} file(s)")
+
+    # Upload each artifact on its own connection; the uploads are
+    # network-bound, so threads overlap the TLS handshakes and PUTs.
+    with ThreadPoolExecutor(max_workers=min(4, len(files))) as executor:
+        futures = {
+            executor.submit(
+                subprocess.run,
+                base_cmd + [f],
+                capture_output=True,
+                text=True,
+                check=False,
+            ): f
+            for f in files
+        }
+        errors = []
+        for future, file in futures.items():
+            result = future.result()
+            if result.returncode != 0:
+                errors.append(f"{file}:\n{result.stderr}")
+
+    if errors:
         print_error("Failed to upload package.")
+        for error in errors:
+            print(error)
+        error_output = "\n".join(errors)
+        if ("401" in error_output or "403" in error_output
+                or "Invalid or non-existent authentication" in error_output):
+            show_auth_instructions(repository, config_file)
         return False
 
+    print_success("Package uploaded successfully!")
+
+    if repository == "testpypi":
+        package_name = get_package_name()
+        print_info(f"\nTo install from TestPyPI, run:")
+        print(f"pip install --index-url https://test.pypi.org/simple/ {package_name}")
+    else:
+        package_name = get_package_name()
+        print_info(f"\nTo install from PyPI, run:")
+        print(f"pip install {package_name}")
+
+    return True
+
 
 def get_package_name():
     """Get the package name from pyproject.toml."""
-    try:
-        import toml
-        with open("pyproject.toml", "r") as f:
-            data = toml.load(f)
-            return data.get("project", {}).get("name", None)
-    except (ImportError, FileNotFoundError):
+    name = _pyproject().get("project", {}).get("name", None)
+    if not name:
         print_error("Failed to get package name from pyproject.toml.")
         exit(1)
+    return name
 
 
 def fetch_url_with_retry(url, max_retries=3, retry_delay=2):
@@ -277,10 +365,17 @@ def main():
     
     # Check for script updates
     check_for_script_updates()
-    
-    if not check_dependencies():
+
+    # The dependency probe and dist cleanup are independent of each other,
+    # so start them together and collect each result right before its
+    # consumer needs it.
+    pool = ThreadPoolExecutor(max_workers=2)
+    dep_future = pool.submit(check_dependencies)
+    clean_future = pool.submit(clean_dist_directory)
+
+    if not dep_future.result():
         sys.exit(1)
-    
+
     # Check for local .pypirc file
     pypirc_path = None
     local_pypirc = Path(".pypirc")
@@ -298,20 +393,6 @@ def main():
             create_local_pypirc()
             pypirc_path = str(local_pypirc.absolute())
     
-    # Check if user is authenticated (only if not using local .pypirc)
-    if not pypirc_path:
-        try:
-            subprocess.run([sys.executable, "-m", "twine", "check", "--strict", "README.md"], 
-                          check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            print_warning("You might not be authenticated with PyPI.")
-            print_info("Please make sure you have a ~/.pypirc file or environment variables set.")
-            print_info("For more information, visit: https://twine.readthedocs.io/en/latest/#configuration")
-            
-            proceed = input("Do you want to proceed anyway? (y/n): ")
-            if proceed.lower() != 'y':
-                sys.exit(0)
-    
     # Prompt for repository
     print_info("\nWhere do you want to publish the package?")
     print("1. TestPyPI (recommended for testing)")
@@ -328,9 +409,11 @@ def main():
             print_info("Operation cancelled.")
             sys.exit(0)
     
-    # Clean dist directory
-    clean_dist_directory()
-    
+    # Make sure the dist cleanup finished (and surface any failure)
+    # before kicking off the build
+    clean_future.result()
+    pool.shutdown()
+
     # Build package
     if not build_package():
         sys.exit(1)